@@ -1,7 +1,10 @@
 import pandas as pd
-import mysql.connector
+import MySQLdb as mysql_db
 from dotenv import load_dotenv
 import os
+import tempfile
+
+from imdb_clean import load_cleaned
 
 # Load environment variables from .env file
 load_dotenv()
@@ -11,27 +14,15 @@ DB_USER = os.getenv("DB_USER")
 DB_PASSWORD = os.getenv("DB_PASSWORD")
 DB_NAME = os.getenv("DB_NAME")
 
-# Load CSV
-csv_path = r"scraping/scraping/imdb_2024_all_movies_cleaned.csv"
-df = pd.read_csv(csv_path)
-print("Columns in CSV:", df.columns.tolist())
-# Fix column names
-df.columns = [str(col).strip().replace(" ", "_") if str(col).strip().lower() not in ["nan", "none", ""] else f"Unknown_{i}"
-              for i, col in enumerate(df.columns)]
-
-
-# Replace 'nan', 'NaN', 'None', empty string with Python None
-def clean_cell(value):
-    if pd.isna(value):
-        return None
-    if str(value).strip().lower() in ["nan", "none", ""]:
-        return None
-    return value
+# Columns of the movies table, in load order
+MOVIE_COLUMNS = ["Title", "Rating", "Votes", "Duration", "Genre"]
 
-df = df.applymap(clean_cell)
+# Load the cleaned data (shared with the dashboard, reuses its Parquet cache)
+df = load_cleaned()
+print("Columns in data:", df.columns.tolist())
 
 # Connect to MySQL and create database if it doesn't exist
-conn = mysql.connector.connect(
+conn = mysql_db.connect(
     host=DB_HOST,
     user=DB_USER,
     password=DB_PASSWORD
@@ -43,11 +34,12 @@ cursor.close()
 conn.close()
 
 # Connect to the new database
-conn = mysql.connector.connect(
+conn = mysql_db.connect(
     host=DB_HOST,
     user=DB_USER,
     password=DB_PASSWORD,
-    database=DB_NAME
+    database=DB_NAME,
+    local_infile=1
 )
 cursor = conn.cursor()
 
@@ -64,21 +56,34 @@ CREATE TABLE IF NOT EXISTS movies (
 cursor.execute(create_table_query)
 print("✅ Table created or already exists.")
 
-# Prepare data for insertion
-data = [tuple(row) for row in df.itertuples(index=False)]
-
-# Insert data using parameterized query
-insert_query = """
-INSERT INTO movies (Title, Rating, Votes, Duration, Genre)
-VALUES (%s, %s, %s, %s, %s)
+# Bulk load the file (requires local_infile=ON on the server)
+load_query = """
+LOAD DATA LOCAL INFILE %s INTO TABLE movies
+FIELDS TERMINATED BY '\\t' OPTIONALLY ENCLOSED BY '"'
+LINES TERMINATED BY '\\n'
+(Title, Rating, Votes, Duration, Genre)
 """
 
+fd, tsv_path = tempfile.mkstemp(suffix=".tsv")
+os.close(fd)
+
 try:
-    cursor.executemany(insert_query, data)
+    # Dump the cleaned frame to a TSV the server can bulk load (\N marks NULL).
+    # LOAD DATA treats backslash as its escape character, so double any in the text columns
+    dump = df[MOVIE_COLUMNS].copy()
+    for col in ["Title", "Votes", "Duration", "Genre"]:
+        if not pd.api.types.is_numeric_dtype(dump[col]):
+            dump[col] = dump[col].astype("string").str.replace("\\", "\\\\", regex=False)
+    dump.to_csv(tsv_path, sep="\t", index=False, header=False, na_rep="\\N",
+                lineterminator="\n")
+    cursor.execute(load_query, (tsv_path.replace("\\", "/"),))
     conn.commit()
     print(f"✅ Inserted {cursor.rowcount} rows into 'movies'.")
-except mysql.connector.Error as err:
+except mysql_db.Error as err:
+    conn.rollback()
     print(f"❌ Error inserting data: {err}")
+finally:
+    os.remove(tsv_path)
 
 # Close connection
 cursor.close()
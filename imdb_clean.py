@@ -0,0 +1,117 @@
+import pandas as pd
+import numpy as np
+import os
+import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Update this path to match your CSV file location
+CSV_PATH = "scraping/scraping/imdb_2024_all_movies_cleaned.csv"
+
+# Bump whenever the cleaned frame's columns or dtypes change so older Parquet caches are ignored
+CACHE_VERSION = 2
+
+# Hours and minutes components of a duration string such as "2h 30m"
+HOURS_PATTERN = re.compile(r'(\d+)h')
+MINUTES_PATTERN = re.compile(r'(\d+)m')
+
+# Numeric part and optional thousands/millions suffix of a vote count such as "12.5K"
+VOTES_PATTERN = re.compile(r'(?P<num>[\d.]+)(?P<suffix>[KM]?)')
+
+
+def normalize_columns(columns):
+    """Strip column names, replace spaces with underscores and name blank/'nan'/'none' columns Unknown_<i>"""
+    cols = columns.astype(str).str.strip().str.replace(' ', '_', regex=False)
+    bad = cols.isna() | cols.str.lower().isin(['nan', 'none', ''])
+    return cols.where(~bad, pd.Index([f'Unknown_{i}' for i in range(len(cols))]))
+
+
+def _clean_rating(rating):
+    """Rating as float64 plus its rating-range bin"""
+    # Kept at float64 so ratings such as 6.2 compare equal to the same slider value
+    rating = pd.Series(pd.to_numeric(rating, errors='coerce').to_numpy(dtype='float64', na_value=np.nan),
+                       index=rating.index)
+    rating_bin = pd.cut(rating, bins=[0, 6, 7, 8, 9, 10], labels=['≤6', '6-7', '7-8', '8-9', '9-10'])
+    return pd.DataFrame({'Rating': rating, 'Rating_Bin': rating_bin})
+
+
+def _clean_votes(votes):
+    """Vote counts as the smallest unsigned integer dtype"""
+    # Remove commas and expand K/M suffixes (e.g. "12.5K" -> 12500)
+    votes = votes.astype("string").str.replace(',', '', regex=False)
+    parts = votes.str.extract(VOTES_PATTERN)
+    multiplier = parts['suffix'].map({'K': 1e3, 'M': 1e6}).fillna(1.0)
+    votes = (pd.to_numeric(parts['num'], errors='coerce') * multiplier).round().astype('Int64')
+    return pd.DataFrame({'Votes': pd.to_numeric(votes, downcast='unsigned')})
+
+
+def _clean_duration(duration):
+    """Duration in minutes (Int32) and hours (float32)"""
+    # Extract duration in minutes from patterns like "2h 30m",
+    # falling back to the first number (assumed minutes) e.g. "120 min"
+    duration = duration.astype("string")
+    hour_part = pd.to_numeric(duration.str.extract(HOURS_PATTERN, expand=False), errors='coerce')
+    minute_part = pd.to_numeric(duration.str.extract(MINUTES_PATTERN, expand=False), errors='coerce')
+    fallback = pd.to_numeric(duration.str.extract(r'(\d+)', expand=False), errors='coerce')
+
+    total_minutes = hour_part.fillna(0) * 60 + minute_part.fillna(0)
+    total_minutes = total_minutes.where(total_minutes > 0, fallback)
+    minutes = total_minutes.where(total_minutes > 0).astype('Int32')
+    hours = (minutes / 60).to_numpy(dtype='float32', na_value=np.nan)
+    return pd.DataFrame({'Duration_Minutes': minutes, 'Duration_Hours': hours}, index=minutes.index)
+
+
+def load_cleaned(csv_path=CSV_PATH):
+    """Load the IMDB CSV and return the cleaned dataframe, reusing the Parquet cache when fresh"""
+    # Reuse the cleaned Parquet copy if it is newer than the CSV
+    cache_path = Path(csv_path).with_suffix(f'.clean.v{CACHE_VERSION}.parquet')
+    if cache_path.exists() and cache_path.stat().st_mtime > Path(csv_path).stat().st_mtime:
+        return pd.read_parquet(cache_path, engine='pyarrow')
+
+    df = pd.read_csv(
+        csv_path,
+        engine="pyarrow",
+        dtype_backend="pyarrow",
+        dtype={"Title": "string", "Votes": "string", "Duration": "string", "Genre": "string"}
+    )
+
+    # Clean column names
+    df.columns = normalize_columns(df.columns)
+
+    # Replace 'nan', 'NaN', 'None', empty string with nulls
+    str_cols = [col for col in df.columns if pd.api.types.is_string_dtype(df[col])]
+    stripped = df[str_cols].apply(lambda s: s.str.strip())
+    missing = stripped.apply(lambda s: s.str.lower().isin(["nan", "none", ""])) | stripped.isna()
+    df[str_cols] = stripped.mask(missing, None)
+
+    # Clean and convert data types; the columns are independent, so clean them concurrently
+    cleaners = {'Rating': _clean_rating, 'Votes': _clean_votes, 'Duration': _clean_duration}
+    with ThreadPoolExecutor(max_workers=len(cleaners)) as pool:
+        futures = [pool.submit(cleaner, df[col]) for col, cleaner in cleaners.items() if col in df.columns]
+        for future in futures:
+            cleaned = future.result()
+            df[cleaned.columns] = cleaned
+
+    # Remove rows with all NaN values
+    df = df.dropna(how='all')
+
+    # Genre has few distinct values; categorical codes make grouping/filtering cheap
+    if 'Genre' in df.columns:
+        df['Genre'] = df['Genre'].astype('category')
+
+    # Persist the cleaned frame so later cold starts skip the CSV parse; write to a
+    # temp file and rename it so concurrent readers never see a partial cache
+    tmp_path = None
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=cache_path.parent, prefix=cache_path.name + '.', suffix='.tmp')
+        os.close(fd)
+        df.to_parquet(tmp_path, engine='pyarrow', compression='zstd')
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+    finally:
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    return df
@@ -4,9 +4,14 @@ import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import numpy as np
-import re
+import numba
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import io
 from datetime import datetime
 
+from imdb_clean import load_cleaned
+
 # Page configuration
 st.set_page_config(
     page_title="IMDB 2024 Movies Dashboard",
@@ -47,67 +52,41 @@ st.markdown("""
 def load_data():
     """Load and preprocess the IMDB data"""
     try:
-        # Update this path to match your CSV file location
-        csv_path = "scraping/scraping/imdb_2024_all_movies_cleaned.csv"
-        df = pd.read_csv(csv_path)
-        
-        # Clean column names
-        df.columns = [str(col).strip().replace(" ", "_") for col in df.columns]
-        
-        # Handle missing values and data cleaning
-        def clean_cell(value):
-            if pd.isna(value):
-                return None
-            if str(value).strip().lower() in ["nan", "none", ""]:
-                return None
-            return value
-        
-        df = df.applymap(clean_cell)
-        
-        # Clean and convert data types
-        if 'Rating' in df.columns:
-            df['Rating'] = pd.to_numeric(df['Rating'], errors='coerce')
-        
-        if 'Votes' in df.columns:
-            # Remove commas and convert to numeric
-            df['Votes'] = df['Votes'].astype(str).str.replace(',', '').str.replace('K', '000').str.replace('M', '000000')
-            df['Votes'] = pd.to_numeric(df['Votes'], errors='coerce')
-        
-        if 'Duration' in df.columns:
-            # Extract duration in minutes
-            def extract_duration(duration_str):
-                if pd.isna(duration_str):
-                    return None
-                duration_str = str(duration_str)
-                # Look for patterns like "2h 30m" or "120 min"
-                hours = re.findall(r'(\d+)h', duration_str)
-                minutes = re.findall(r'(\d+)m', duration_str)
-                
-                total_minutes = 0
-                if hours:
-                    total_minutes += int(hours[0]) * 60
-                if minutes:
-                    total_minutes += int(minutes[0])
-                
-                # If no h/m pattern found, try to extract just numbers (assume minutes)
-                if total_minutes == 0:
-                    nums = re.findall(r'\d+', duration_str)
-                    if nums:
-                        total_minutes = int(nums[0])
-                
-                return total_minutes if total_minutes > 0 else None
-            
-            df['Duration_Minutes'] = df['Duration'].apply(extract_duration)
-            df['Duration_Hours'] = df['Duration_Minutes'] / 60
-        
-        # Remove rows with all NaN values
-        df = df.dropna(how='all')
-        
-        return df
+        return load_cleaned()
     except Exception as e:
         st.error(f"Error loading data: {str(e)}")
         return pd.DataFrame()
 
+def _frame_key(df):
+    """Cheap cache key for a dataframe: the filters that produced it (see apply_filters)"""
+    key = df.attrs.get('filter_key')
+    return key if key is not None else pd.util.hash_pandas_object(df).sum()
+
+FRAME_HASH_FUNCS = {pd.DataFrame: _frame_key}
+
+# Per-filter caches are keyed on free-form widget values; cap them so a long-running server stays bounded
+FRAME_CACHE_ENTRIES = 64
+
+def _float_values(series):
+    """Numeric column as a float64 numpy array with NaN for missing values"""
+    return series.to_numpy(dtype='float64', na_value=np.nan)
+
+@st.cache_data(hash_funcs=FRAME_HASH_FUNCS, max_entries=FRAME_CACHE_ENTRIES)
+def genre_counts(df):
+    """Number of movies per genre, most common first"""
+    counts = df['Genre'].value_counts()
+    return counts[counts > 0]
+
+@st.cache_data(hash_funcs=FRAME_HASH_FUNCS, max_entries=FRAME_CACHE_ENTRIES)
+def genre_mean_duration(df):
+    """Average duration in hours per genre, longest first"""
+    return df.groupby('Genre', observed=True)['Duration_Hours'].mean().sort_values(ascending=False)
+
+@st.cache_data(hash_funcs=FRAME_HASH_FUNCS, max_entries=FRAME_CACHE_ENTRIES)
+def genre_rating_table(df):
+    """Movie counts per genre and rating range"""
+    return df.groupby(['Genre', 'Rating_Bin'], observed=True).size().unstack(fill_value=0)
+
 def create_summary_metrics(df):
     """Create summary metrics cards"""
     col1, col2, col3, col4 = st.columns(4)
@@ -128,12 +107,23 @@ def create_summary_metrics(df):
         unique_genres = df['Genre'].nunique() if 'Genre' in df.columns else 0
         st.metric("Unique Genres", unique_genres)
 
+@st.cache_data(hash_funcs=FRAME_HASH_FUNCS, max_entries=FRAME_CACHE_ENTRIES)
 def create_top_movies_chart(df, metric='Rating', top_n=10):
     """Create top movies chart"""
     if metric not in df.columns:
         return None
     
-    top_movies = df.nlargest(top_n, metric)[['Title', metric]].copy()
+    # Partial selection of the top rows instead of a full sort
+    vals = _float_values(df[metric])
+    valid = np.flatnonzero(~np.isnan(vals))
+    k = min(top_n, valid.size)
+    if k == 0:
+        return None
+    # Keep every row tied with the k-th value, then break ties by row order like nlargest(keep='first')
+    kth = np.partition(vals[valid], valid.size - k)[valid.size - k]
+    candidates = valid[vals[valid] >= kth]
+    idx = candidates[np.lexsort((candidates, -vals[candidates]))][:k]
+    top_movies = df.iloc[idx][['Title', metric]]
     
     fig = px.bar(
         top_movies, 
@@ -151,21 +141,22 @@ def create_top_movies_chart(df, metric='Rating', top_n=10):
         template='plotly_white'
     )
     
-    return fig
+    return fig.to_dict()
 
+@st.cache_data(hash_funcs=FRAME_HASH_FUNCS, max_entries=FRAME_CACHE_ENTRIES)
 def create_genre_distribution(df):
     """Create genre distribution chart"""
     if 'Genre' not in df.columns:
         return None
     
-    genre_counts = df['Genre'].value_counts().head(20)
+    top_genres = genre_counts(df).head(20)
     
     fig = px.bar(
-        x=genre_counts.index,
-        y=genre_counts.values,
+        x=top_genres.index,
+        y=top_genres.values,
         title='Movie Distribution by Genre (Top 20)',
         labels={'x': 'Genre', 'y': 'Number of Movies'},
-        color=genre_counts.values,
+        color=top_genres.values,
         color_continuous_scale='plasma'
     )
     
@@ -175,8 +166,9 @@ def create_genre_distribution(df):
         template='plotly_white'
     )
     
-    return fig
+    return fig.to_dict()
 
+@st.cache_data(hash_funcs=FRAME_HASH_FUNCS, max_entries=FRAME_CACHE_ENTRIES)
 def create_rating_distribution(df):
     """Create rating distribution histogram"""
     if 'Rating' not in df.columns:
@@ -196,8 +188,9 @@ def create_rating_distribution(df):
         template='plotly_white'
     )
     
-    return fig
+    return fig.to_dict()
 
+@st.cache_data(hash_funcs=FRAME_HASH_FUNCS, max_entries=FRAME_CACHE_ENTRIES)
 def create_duration_analysis(df):
     """Create duration analysis charts"""
     if 'Duration_Hours' not in df.columns:
@@ -217,7 +210,7 @@ def create_duration_analysis(df):
     
     # Average duration by genre
     if 'Genre' in df.columns:
-        genre_duration = df.groupby('Genre')['Duration_Hours'].mean().sort_values(ascending=False).head(15)
+        genre_duration = genre_mean_duration(df).head(15)
         
         fig2 = px.bar(
             x=genre_duration.values,
@@ -237,8 +230,21 @@ def create_duration_analysis(df):
     else:
         fig2 = None
     
-    return fig1, fig2
+    return fig1.to_dict(), fig2.to_dict() if fig2 else None
+
+@numba.njit(cache=True, fastmath=True)
+def _fit_line(x, y):
+    """Closed-form least-squares slope and intercept of y = m*x + b"""
+    n = x.size
+    sx = x.sum()
+    sy = y.sum()
+    sxx = (x * x).sum()
+    sxy = (x * y).sum()
+    m = (n * sxy - sx * sy) / (n * sxx - sx * sx)
+    b = (sy - m * sx) / n
+    return m, b
 
+@st.cache_data(hash_funcs=FRAME_HASH_FUNCS, max_entries=FRAME_CACHE_ENTRIES)
 def create_correlation_analysis(df):
     """Create correlation scatter plot"""
     if 'Rating' not in df.columns or 'Votes' not in df.columns:
@@ -247,33 +253,37 @@ def create_correlation_analysis(df):
     # Remove outliers for better visualization
     clean_df = df.dropna(subset=['Rating', 'Votes'])
     
+    # Plot a stable sample of large frames; the trendline below still uses every row
+    plot_df = clean_df.sample(5000, random_state=0) if len(clean_df) > 5000 else clean_df
+    
     fig = px.scatter(
-        clean_df,
+        plot_df,
         x='Rating',
         y='Votes',
         title='Correlation: Rating vs Vote Count',
         labels={'Rating': 'IMDb Rating', 'Votes': 'Number of Votes'},
         opacity=0.6,
         color='Rating',
-        color_continuous_scale='viridis'
+        color_continuous_scale='viridis',
+        render_mode='webgl'
     )
     
-    # Add manual trendline using numpy polyfit (alternative to statsmodels)
+    # Add manual trendline using a closed-form fit (alternative to statsmodels)
     if len(clean_df) > 1:
         # Calculate linear regression manually
-        x = clean_df['Rating'].values
-        y = clean_df['Votes'].values
+        x = _float_values(clean_df['Rating'])
+        y = _float_values(clean_df['Votes'])
         
         # Remove any remaining NaN values
         mask = ~(np.isnan(x) | np.isnan(y))
         x_clean = x[mask]
         y_clean = y[mask]
         
-        if len(x_clean) > 1:
+        if len(x_clean) > 1 and x_clean.min() < x_clean.max():
             # Fit linear regression
-            coeffs = np.polyfit(x_clean, y_clean, 1)
+            slope, intercept = _fit_line(x_clean, y_clean)
             trendline_x = np.linspace(x_clean.min(), x_clean.max(), 100)
-            trendline_y = np.polyval(coeffs, trendline_x)
+            trendline_y = slope * trendline_x + intercept
             
             # Add trendline to plot
             fig.add_trace(
@@ -288,22 +298,19 @@ def create_correlation_analysis(df):
     
     fig.update_layout(height=400, template='plotly_white')
     
-    return fig
+    return fig.to_dict()
 
+@st.cache_data(hash_funcs=FRAME_HASH_FUNCS, max_entries=FRAME_CACHE_ENTRIES)
 def create_genre_rating_heatmap(df):
     """Create genre vs rating heatmap"""
     if 'Genre' not in df.columns or 'Rating' not in df.columns:
         return None
     
-    # Create rating bins
-    df_clean = df.dropna(subset=['Genre', 'Rating']).copy()
-    df_clean['Rating_Bin'] = pd.cut(df_clean['Rating'], bins=[0, 6, 7, 8, 9, 10], labels=['≤6', '6-7', '7-8', '8-9', '9-10'])
-    
-    # Create crosstab
-    heatmap_data = pd.crosstab(df_clean['Genre'], df_clean['Rating_Bin'])
+    # Genre x rating-range counts
+    heatmap_data = genre_rating_table(df)
     
     # Take top 15 genres
-    top_genres = df_clean['Genre'].value_counts().head(15).index
+    top_genres = heatmap_data.sum(axis=1).sort_values(ascending=False).head(15).index
     heatmap_data = heatmap_data.loc[top_genres]
     
     fig = px.imshow(
@@ -317,37 +324,65 @@ def create_genre_rating_heatmap(df):
     
     fig.update_layout(height=500, template='plotly_white')
     
-    return fig
+    return fig.to_dict()
 
 def apply_filters(df, filters):
     """Apply user-selected filters to the dataframe"""
-    filtered_df = df.copy()
+    mask = np.ones(len(df), dtype=bool)
     
     # Rating filter
     if filters['min_rating'] > 0:
-        filtered_df = filtered_df[filtered_df['Rating'] >= filters['min_rating']]
+        mask &= _float_values(df['Rating']) >= filters['min_rating']
     
     # Duration filter
     if filters['duration_range'] != 'All':
-        if 'Duration_Hours' in filtered_df.columns:
+        if 'Duration_Hours' in df.columns:
+            hours = _float_values(df['Duration_Hours'])
             if filters['duration_range'] == '< 2 hours':
-                filtered_df = filtered_df[filtered_df['Duration_Hours'] < 2]
+                mask &= hours < 2
             elif filters['duration_range'] == '2-3 hours':
-                filtered_df = filtered_df[(filtered_df['Duration_Hours'] >= 2) & (filtered_df['Duration_Hours'] <= 3)]
+                mask &= (hours >= 2) & (hours <= 3)
             elif filters['duration_range'] == '> 3 hours':
-                filtered_df = filtered_df[filtered_df['Duration_Hours'] > 3]
+                mask &= hours > 3
     
     # Voting filter
     if filters['min_votes'] > 0:
-        if 'Votes' in filtered_df.columns:
-            filtered_df = filtered_df[filtered_df['Votes'] >= filters['min_votes']]
+        if 'Votes' in df.columns:
+            mask &= _float_values(df['Votes']) >= filters['min_votes']
     
-    # Genre filter
+    # Genre filter (compare categorical codes rather than strings)
     if filters['selected_genres']:
-        filtered_df = filtered_df[filtered_df['Genre'].isin(filters['selected_genres'])]
+        sel_codes = df['Genre'].cat.categories.get_indexer(filters['selected_genres'])
+        mask &= np.isin(df['Genre'].cat.codes.to_numpy(), sel_codes[sel_codes >= 0])
+    
+    filtered_df = df.iloc[mask]
+    
+    # Tag the result with its filters so cached aggregations can key on them
+    filtered_df.attrs['filter_key'] = tuple(
+        (name, tuple(value) if isinstance(value, list) else value)
+        for name, value in sorted(filters.items())
+    )
     
     return filtered_df
 
+@st.cache_data(max_entries=8)
+def _csv_bytes(_df, cache_key):
+    """CSV export of the displayed table, cached on the filters/columns/sort that produced it"""
+    try:
+        buffer = io.BytesIO()
+        pa_csv.write_csv(pa.Table.from_pandas(_df, preserve_index=False), buffer)
+        return buffer.getvalue()
+    except pa.ArrowException:
+        # Fall back to pandas for column types the Arrow CSV writer can't handle
+        return _df.to_csv(index=False).encode('utf-8')
+
+@st.cache_data
+def _widget_domains(_df):
+    """Filter-independent widget inputs: sorted genre list and maximum vote count"""
+    all_genres = _df['Genre'].cat.categories.tolist() if 'Genre' in _df.columns else []
+    max_votes = int(_df['Votes'].max()) if 'Votes' in _df.columns else 100000
+    return all_genres, max_votes
+
 def main():
     # Header
     st.markdown('<h1 class="main-header">🎬 IMDB 2024 Movies Dashboard</h1>', unsafe_allow_html=True)
@@ -359,6 +394,8 @@ def main():
         st.error("No data available. Please check your CSV file path.")
         return
     
+    all_genres, max_votes = _widget_domains(df)
+    
     # Sidebar filters
     st.sidebar.header("🔧 Filters & Controls")
     
@@ -379,14 +416,13 @@ def main():
     min_votes = st.sidebar.number_input(
         "Minimum Votes",
         min_value=0,
-        max_value=int(df['Votes'].max()) if 'Votes' in df.columns else 100000,
+        max_value=max_votes,
         value=0,
         step=1000
     )
     
     # Genre filter
     if 'Genre' in df.columns:
-        all_genres = sorted(df['Genre'].dropna().unique())
         selected_genres = st.sidebar.multiselect(
             "Select Genres",
             options=all_genres,
@@ -503,7 +539,13 @@ def main():
                 )
                 
                 # Download button
-                csv = display_df.to_csv(index=False)
+                csv = _csv_bytes(display_df, (
+                    filtered_df.attrs.get('filter_key'),
+                    tuple(display_columns),
+                    sort_column,
+                    sort_ascending,
+                    len(filtered_df)
+                ))
                 st.download_button(
                     label="Download filtered data as CSV",
                     data=csv,